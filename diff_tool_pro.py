@@ -1,178 +1,502 @@
 import os
 import sys
+import time
+import sqlite3
 import hashlib
 import zipfile
-import tempfile
 import threading
+import multiprocessing
+from array import array
+from itertools import repeat
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import io
 import json
+import gzip
+import base64
 import webbrowser
 import mimetypes
 from difflib import SequenceMatcher
+try:
+    from rapidfuzz.distance import Indel # C++ 实现，比 difflib 快几十倍
+except ImportError:
+    Indel = None # 未安装时退回 difflib
+try:
+    import xxhash # 非加密哈希，比 SHA256 快一个数量级
+except ImportError:
+    xxhash = None # 未安装时退回 SHA256
 from datetime import datetime
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
 # --- 核心逻辑部分 ---
 
+HASH_BLOCK_SIZE = 1024 * 1024  # 逐块计算哈希时每次读取 1 MiB
+MAX_WORKERS_LIMIT = 32  # 并发读取上限，避免机械硬盘被过多线程拖慢
+TEXT_SIMILARITY_MAX_BYTES = 256 * 1024  # 文本相似度每边最多读取的字节数；Indel 为 O(N·M/64)，256 KiB 一对约 1~2 秒
+TEXT_SIMILARITY_MIN_SIZE_RATIO = 0.1  # 两个文件大小相差超过 10 倍时，直接认为文本相似度为 0
+TEXT_SIMILARITY_QUICK_THRESHOLD = 0.3  # 相似度上界低于该值时，不再计算精确的相似度
+COMPARE_BLOCK_SIZE = 1024 * 1024  # 逐块比对内容时每次读取 1 MiB
+FINGERPRINT_SIZE = 4096  # 快速指纹：文件头尾各读取 4 KiB
+PROCESS_POOL_MIN_FILES = 200  # 待读取文件少于该数量时用线程，省去启动进程的开销
+TEXT_SNIFF_SIZE = 8192  # 判断文本文件时读取的字节数
+# 跨次运行的哈希缓存。Windows 上 st_ctime 是创建时间，原地改写文件不会变，无法用来识别改动，因此默认不启用
+HASH_CACHE_PATH = None if os.name == "nt" else os.path.join(os.path.expanduser("~"), ".diffcache.sqlite")
+HASH_CACHE_MAX_AGE = 30 * 24 * 3600  # 缓存条目保留 30 天
+# file(1) 同款启发式：去掉这些字节后仍有剩余（NUL 等控制字符）即视为二进制
+TEXTCHARS = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
+# 对比结果按列存储，分类用 1 字节编码；下标即编码
+CATEGORIES = ("same", "diff", "added", "deleted")
+CATEGORY_STATUS = ("相同", "差异", "新增", "已删除")
+SAME, DIFF, ADDED, DELETED = range(len(CATEGORIES))
+NO_SIMILARITY = -1.0  # 非文本文件无法计算相似度，显示为 "Hash不同"
+# 相似度的可信程度，可组合；没有标记时为精确值
+SIM_PREFIX = 1  # 文件超过 TEXT_SIMILARITY_MAX_BYTES，只比较了开头部分
+SIM_BELOW = 2  # 只知道上界低于 TEXT_SIMILARITY_QUICK_THRESHOLD，数值仅用于排序
+
+def iter_details(details, start=0, stop=None):
+    """按行读取列式存储的对比结果，产出 (路径, 分类, 状态, 相似度, 相似度文本, A 大小, B 大小, 大小差异)"""
+    paths, category, similarity = details["path"], details["category"], details["similarity"]
+    size_a, size_b, sim_flags = details["size_a"], details["size_b"], details["similarity_flags"]
+    for i in range(start, len(paths) if stop is None else stop):
+        code, sim, flags = category[i], similarity[i], sim_flags[i]
+        if code == SAME:
+            sim_str = "100%"
+        elif code != DIFF:
+            sim_str = "0%"
+        elif sim == NO_SIMILARITY:
+            sim, sim_str = 0.0, "Hash不同"
+        else:
+            sim_str = f"<{TEXT_SIMILARITY_QUICK_THRESHOLD:.0%}" if flags & SIM_BELOW else f"{sim:.1%}"
+            if flags & SIM_PREFIX:
+                sim_str += f" (前 {TEXT_SIMILARITY_MAX_BYTES // 1024} KiB)"
+        yield (paths[i], CATEGORIES[code], CATEGORY_STATUS[code], sim, sim_str,
+               size_a[i], size_b[i], size_b[i] - size_a[i])
+
+def _hash_name(crypto=False):
+    """当前使用的哈希算法名，同时作为缓存键的一部分"""
+    return "xxh3_128" if xxhash is not None and not crypto else "sha256"
+
+def _new_hash(crypto=False):
+    return xxhash.xxh3_128() if _hash_name(crypto) == "xxh3_128" else hashlib.sha256()
+
+_zip_local = threading.local() # 每个线程（进程）各自缓存打开的 ZipFile，读取位置互不干扰
+
+def _open_entry(loc):
+    """以二进制只读方式打开条目：loc 为磁盘路径，或 (压缩包路径, 包内文件名)，后者直接从压缩包中流式读取，无需解压"""
+    if isinstance(loc, str):
+        return open(loc, "rb")
+    archive_path, name = loc
+    handles = getattr(_zip_local, "handles", None)
+    if handles is None:
+        handles = _zip_local.handles = {}
+    zip_ref = handles.get(archive_path)
+    if zip_ref is None:
+        zip_ref = handles[archive_path] = zipfile.ZipFile(archive_path, 'r')
+    return zip_ref.open(name)
+
+def _entry_name(loc):
+    return loc if isinstance(loc, str) else loc[1]
+
+_WINDOWS_ILLEGAL_CHARS = str.maketrans(':<>|"?*', "_______")
+
+def _member_rel_path(name):
+    """把压缩包内的文件名规整为相对路径，与 ZipFile.extractall 解压到磁盘时的处理一致：
+    去掉盘符以及空、"."、".." 段；Windows 上还会替换非法字符、去掉每段末尾的点"""
+    name = os.path.splitdrive(name.replace("\\", "/"))[1]
+    parts = [x for x in name.split("/") if x not in ("", ".", "..")]
+    if os.name == "nt":
+        parts = [x.translate(_WINDOWS_ILLEGAL_CHARS).rstrip(".") for x in parts]
+        parts = [x for x in parts if x]
+    return "/".join(parts)
+
+def _hash_path(loc, crypto=False):
+    """计算文件哈希：只用于判断内容是否一致，默认用 xxh3_128；crypto=True 或未安装 xxhash 时用 SHA256"""
+    try:
+        with _open_entry(loc) as f:
+            # 3.11+ 由 C 层直接把文件流喂给 OpenSSL，省去 Python 循环
+            if _hash_name(crypto) == "sha256" and hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            file_hash = _new_hash(crypto)
+            for byte_block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                file_hash.update(byte_block)
+            return file_hash.hexdigest()
+    except Exception:
+        return None
+
+def _fingerprint(f, size):
+    """文件头尾各 4 KiB 拼成快速指纹；文件不超过 8 KiB 时即为全部内容"""
+    head = f.read(FINGERPRINT_SIZE)
+    if size <= 2 * FINGERPRINT_SIZE:
+        return head + f.read()
+    f.seek(size - FINGERPRINT_SIZE)
+    return head + f.read(FINGERPRINT_SIZE)
+
+def _files_equal(loc1, loc2, with_hash=False, crypto=False):
+    """两个文件逐块比对，遇到第一处不同立即返回（模块级函数，供进程池调用）
+    返回 (是否相同, 哈希)；with_hash=True 且内容相同时顺带算出哈希（两边相同，只需算一份），否则哈希为 None"""
+    try:
+        with _open_entry(loc1) as f1, _open_entry(loc2) as f2:
+            file_hash = _new_hash(crypto) if with_hash else None
+            # 压缩包条目只能顺序解压，跳着读代价很大，直接从头逐块比对（条目 CRC 已在 compare 中比过）
+            if isinstance(loc1, str) and isinstance(loc2, str):
+                size = os.fstat(f1.fileno()).st_size
+                if size != os.fstat(f2.fileno()).st_size:
+                    return False, None
+                # 先比头尾指纹：大多数有差异的文件只需读 8 KiB 就能判定
+                fingerprint = _fingerprint(f1, size)
+                if fingerprint != _fingerprint(f2, size):
+                    return False, None
+                if size <= 2 * FINGERPRINT_SIZE:
+                    if file_hash:
+                        file_hash.update(fingerprint)
+                        return True, file_hash.hexdigest()
+                    return True, None
+                # 需要哈希时从头读起，否则跳过已比过的文件头
+                start = 0 if file_hash else FINGERPRINT_SIZE
+                f1.seek(start)
+                f2.seek(start)
+
+            buf1 = bytearray(COMPARE_BLOCK_SIZE)
+            buf2 = bytearray(COMPARE_BLOCK_SIZE)
+            while True:
+                n1 = f1.readinto(buf1)
+                n2 = f2.readinto(buf2)
+                if n1 != n2:
+                    return False, None
+                if n1 == 0:
+                    return True, file_hash.hexdigest() if file_hash else None
+                # 不满一块（通常是最后一块）时原地截短缓冲区，不用切片复制出两份新数据
+                if n1 < len(buf1):
+                    del buf1[n1:]
+                    del buf2[n1:]
+                # 整块直接比较（memcmp）
+                if buf1 != buf2:
+                    return False, None
+                if file_hash:
+                    file_hash.update(buf1)
+    except Exception:
+        return False, None
+
+class HashCache:
+    """跨次运行的哈希缓存（SQLite）：键包含路径、大小和修改时间，文件变化后自然失效"""
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS hashes (k TEXT PRIMARY KEY, v TEXT NOT NULL, t INTEGER NOT NULL)")
+        self.conn.execute("DELETE FROM hashes WHERE t < ?", (int(time.time()) - HASH_CACHE_MAX_AGE,))
+
+    def get_many(self, keys, batch_size=500):
+        """批量查询，返回 {键: 哈希}，未命中的键不在结果中"""
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            placeholders = ",".join("?" * len(batch))
+            found.update(self.conn.execute(f"SELECT k, v FROM hashes WHERE k IN ({placeholders})", batch))
+        return found
+
+    def put_many(self, entries):
+        """批量写入 {键: 哈希}，放在一个事务里提交"""
+        if not entries:
+            return
+        now = int(time.time())
+        self.conn.execute("BEGIN")
+        self.conn.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?)", [(k, v, now) for k, v in entries.items()])
+        self.conn.execute("COMMIT")
+
+    def close(self):
+        self.conn.close()
+
 class FileAnalyzer:
-    def __init__(self):
+    def __init__(self, max_workers=None, crypto_hash=False, cache_path=HASH_CACHE_PATH):
         self.stop_event = threading.Event()
+        self.crypto_hash = crypto_hash # 需要 SHA256 时打开，否则用更快的 xxh3
+        self.cache_path = cache_path # 为 None 时不使用跨次运行的哈希缓存
+        self.max_workers = max(1, min(max_workers or os.cpu_count() or 1, MAX_WORKERS_LIMIT))
+        self._text_cache = {} # {路径: 是否文本}，每次 compare 开始时清空
 
     def get_file_hash(self, filepath):
-        """计算文件SHA256"""
-        sha256_hash = hashlib.sha256()
+        """计算文件哈希（默认 xxh3_128，crypto_hash=True 时为 SHA256）"""
+        return _hash_path(filepath, self.crypto_hash)
+
+    def _open_cache(self):
+        # 只在有 xxh3 时缓存：否则要为每个相同的文件从头算一遍 SHA256，得不偿失
+        if not self.cache_path or _hash_name(self.crypto_hash) != "xxh3_128":
+            return None
         try:
-            with open(filepath, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
-            return sha256_hash.hexdigest()
-        except Exception:
+            return HashCache(self.cache_path)
+        except sqlite3.Error as e:
+            print(f"Hash cache disabled: {e}")
             return None
 
+    def files_equal(self, pairs, callback_progress=None):
+        """批量比对 [(文件A, 文件B, 缓存键A, 缓存键B)]，返回对应的 [是否相同]
+        两边哈希都在缓存中时直接比较哈希，无需读取文件；其余的逐块比对，文件较多时用多进程"""
+        prefix = _hash_name(self.crypto_hash) + "|"
+        cache = self._open_cache()
+        cached = {}
+        if cache:
+            try:
+                cached = cache.get_many(prefix + k for _, _, key_a, key_b in pairs for k in (key_a, key_b))
+            except sqlite3.Error as e:
+                print(f"Hash cache error: {e}")
+
+        equal = [False] * len(pairs)
+        todo = []
+        for i, (_, _, key_a, key_b) in enumerate(pairs):
+            hash_a, hash_b = cached.get(prefix + key_a), cached.get(prefix + key_b)
+            if hash_a and hash_b:
+                equal[i] = hash_a == hash_b
+            else:
+                todo.append(i)
+
+        map_kwargs = {}
+        if len(todo) * 2 < PROCESS_POOL_MIN_FILES:
+            executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        else:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            # 每个进程约分到 4 批：既减少进程间往返，又让所有核心都有活干、进度均匀更新
+            map_kwargs["chunksize"] = max(1, len(todo) // (self.max_workers * 4))
+
+        new_hashes = {}
+        with executor:
+            results = executor.map(_files_equal,
+                                   [pairs[i][0] for i in todo], [pairs[i][1] for i in todo],
+                                   repeat(cache is not None), repeat(self.crypto_hash), **map_kwargs)
+            for done, (i, (is_equal, file_hash)) in enumerate(zip(todo, results), 1):
+                equal[i] = is_equal
+                if file_hash:
+                    new_hashes[prefix + pairs[i][2]] = file_hash
+                    new_hashes[prefix + pairs[i][3]] = file_hash
+                if callback_progress and done % 20 == 0:
+                    callback_progress(f"比对内容... {done}/{len(todo)}")
+
+        if cache:
+            try:
+                cache.put_many(new_hashes)
+            except sqlite3.Error as e:
+                print(f"Hash cache error: {e}")
+            cache.close()
+        return equal
+
     def is_text_file(self, filepath):
         """简单判断是否为文本文件"""
-        guess, _ = mimetypes.guess_type(filepath)
+        cached = self._text_cache.get(filepath)
+        if cached is not None:
+            return cached
+        guess, _ = mimetypes.guess_type(_entry_name(filepath))
         if guess and guess.startswith('text'):
-            return True
+            is_text = True
+        else:
+            try:
+                with _open_entry(filepath) as f:
+                    chunk = f.read(TEXT_SNIFF_SIZE)
+                # translate 在 C 层删除所有文本字符，无需逐字节解码或抛异常
+                is_text = bool(chunk) and not chunk.translate(None, TEXTCHARS)
+            except Exception:
+                is_text = False
+        self._text_cache[filepath] = is_text
+        return is_text
+
+    def get_text_similarity(self, file1, file2, size1=None, size2=None):
+        """计算文本相似度，返回 (相似度, 标记)，标记见 SIM_PREFIX / SIM_BELOW；
+        已知文件大小时传入 size1/size2，大小悬殊的文件不必读取"""
+        if size1 is not None and size2 is not None:
+            if not size1 or not size2:
+                return 0.0, 0
+            if min(size1, size2) / max(size1, size2) < TEXT_SIMILARITY_MIN_SIZE_RATIO:
+                return 0.0, SIM_BELOW # 此时上界 2*小/(大+小) 不到 0.2
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                f.read(512)
-                return True
+            # rapidfuzz 直接按字节比较，省去 UTF-8 解码及其带来的 2~4 倍内存；多读 1 字节用来判断是否截断
+            with _open_entry(file1) as f1:
+                data1 = f1.read(TEXT_SIMILARITY_MAX_BYTES + 1)
+            with _open_entry(file2) as f2:
+                data2 = f2.read(TEXT_SIMILARITY_MAX_BYTES + 1)
+            flags = 0
+            if len(data1) > TEXT_SIMILARITY_MAX_BYTES or len(data2) > TEXT_SIMILARITY_MAX_BYTES:
+                flags = SIM_PREFIX # 只比较了开头部分，之后的差异看不到
+                data1 = data1[:TEXT_SIMILARITY_MAX_BYTES]
+                data2 = data2[:TEXT_SIMILARITY_MAX_BYTES]
+            if Indel is not None:
+                # 公共字节数（直方图交集）是 Indel 相似度的上界，只需线性时间；上界已经很低时不再计算
+                common = sum((Counter(data1) & Counter(data2)).values())
+                upper = 2 * common / (len(data1) + len(data2)) if data1 or data2 else 1.0
+                if upper < TEXT_SIMILARITY_QUICK_THRESHOLD:
+                    return upper, flags | SIM_BELOW
+                # 与 SequenceMatcher.ratio() 同为 2*M/T 的归一化相似度
+                return Indel.normalized_similarity(data1, data2), flags
+            # difflib 的 autojunk 会把 UTF-8 多字节字符的前导、后续字节当成高频元素，非 ASCII 文本的相似度严重偏低，
+            # 因此退回 difflib 时仍解码为文本比较
+            matcher = SequenceMatcher(None, data1.decode("utf-8", errors="ignore"), data2.decode("utf-8", errors="ignore"))
+            # real_quick_ratio()（只看长度）和 quick_ratio()（只数公共字符）都是 ratio() 的上界，
+            # 上界已经很低时直接返回，省去 ratio() 的平方级计算
+            upper = matcher.real_quick_ratio()
+            if upper < TEXT_SIMILARITY_QUICK_THRESHOLD:
+                return upper, flags | SIM_BELOW
+            upper = matcher.quick_ratio()
+            if upper < TEXT_SIMILARITY_QUICK_THRESHOLD:
+                return upper, flags | SIM_BELOW
+            return matcher.ratio(), flags
         except:
-            return False
+            return 0.0, 0
+
+    def list_archive(self, archive_path):
+        """列出压缩包内的文件，返回 {相对路径: ((压缩包路径, 包内文件名), 大小, 缓存键, CRC32, 文件标识)}
+        只读取中央目录，不解压；内容在对比时直接从压缩包中流式读取"""
+        archive_path = os.path.abspath(archive_path)
+        st = os.stat(archive_path)
+        # 缓存键使用压缩包自身的路径、大小、inode、修改时间和状态改变时间 + 包内原始文件名
+        cache_prefix = f"{archive_path}|{st.st_size}|{st.st_ino}|{st.st_mtime_ns}|{st.st_ctime_ns}!"
+        archive_id = (st.st_dev, st.st_ino) if st.st_ino else None # 同一个压缩包经不同路径打开时也能识别
+        file_map = {} # 重名条目以后出现的为准，与解压时的覆盖行为一致
+        with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+            for info in zip_ref.infolist():
+                if info.is_dir():
+                    continue
+                # 规整后的路径用来与另一边匹配；读取时仍用原始文件名定位条目
+                rel_path = _member_rel_path(info.filename)
+                if not rel_path:
+                    continue
+                file_id = archive_id and archive_id + (info.filename,)
+                file_map[rel_path] = ((archive_path, info.filename), info.file_size, cache_prefix + info.filename, info.CRC, file_id)
+        return file_map
 
-    def get_text_similarity(self, file1, file2):
-        """计算文本相似度"""
-        try:
-            with open(file1, 'r', encoding='utf-8', errors='ignore') as f1:
-                text1 = f1.read()
-            with open(file2, 'r', encoding='utf-8', errors='ignore') as f2:
-                text2 = f2.read()
-            return SequenceMatcher(None, text1, text2).ratio()
-        except:
-            return 0.0
+    def scan_files(self, scan_root):
+        """遍历目录，返回 {相对路径: (绝对路径, 大小, 缓存键, None, 文件标识)}；大小取自 scandir 的条目信息，无需再单独 getsize
+        缓存键由路径、大小、inode、修改时间和状态改变时间组成（ctime 每次写入都会变，utime 也改不了）；
+        第四项对应压缩包条目的 CRC32，磁盘文件没有；文件标识为 (st_dev, st_ino)，用来识别两边指向同一个文件"""
+        file_map = {}
+        stack = [(scan_root, "")]
+        while stack:
+            dir_path, rel_dir = stack.pop()
+            try:
+                with os.scandir(dir_path) as it:
+                    for entry in it:
+                        rel_path = rel_dir + entry.name
+                        try:
+                            # 与 os.walk 一致：不进入目录软链接，文件软链接按目标文件处理
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append((entry.path, rel_path + "/"))
+                            elif entry.is_file():
+                                st = entry.stat()
+                                cache_key = f"{entry.path}|{st.st_size}|{st.st_ino}|{st.st_mtime_ns}|{st.st_ctime_ns}"
+                                # Windows 上 scandir 给出的 st_ino 恒为 0，此时不做同一文件判断
+                                file_id = (st.st_dev, st.st_ino) if st.st_ino else None
+                                file_map[rel_path] = (entry.path, st.st_size, cache_key, None, file_id)
+                        except OSError:
+                            continue
+            except OSError as e:
+                print(f"Error scanning {dir_path}: {e}")
+        return file_map
 
-    def extract_or_walk(self, target_path, temp_dir):
-        """处理文件夹或压缩包"""
-        file_map = {} 
+    def extract_or_walk(self, target_path):
+        """处理文件夹或压缩包，返回 {相对路径: (位置, 大小, 缓存键, CRC32, 文件标识)}"""
         ext = os.path.splitext(target_path)[1].lower()
         is_archive = ext in ['.zip', '.ipa', '.apk', '.jar']
         
-        scan_root = target_path
         if is_archive:
             try:
-                extract_path = os.path.join(temp_dir, "extracted_" + os.path.basename(target_path) + "_" + str(hash(target_path)))
-                os.makedirs(extract_path, exist_ok=True)
-                with zipfile.ZipFile(target_path, 'r') as zip_ref:
-                    zip_ref.extractall(extract_path)
-                scan_root = extract_path
+                return self.list_archive(target_path)
             except Exception as e:
-                print(f"Error extracting {target_path}: {e}")
+                print(f"Error reading {target_path}: {e}")
                 return {}
 
-        scan_root = os.path.abspath(scan_root)
-        for root, _, files in os.walk(scan_root):
-            for file in files:
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, scan_root)
-                rel_path = rel_path.replace("\\", "/")
-                file_map[rel_path] = full_path
-        return file_map
+        return self.scan_files(os.path.abspath(target_path))
+
+    def _pair_similarity(self, pair):
+        """有差异的一对文件：都是文本时返回 (相似度, 标记)，否则返回 None"""
+        p_a, p_b, size_a, size_b = pair
+        if self.is_text_file(p_a) and self.is_text_file(p_b):
+            return self.get_text_similarity(p_a, p_b, size_a, size_b)
+        return None
 
     def compare(self, path_a, path_b, callback_progress=None):
-        result = {
-            "summary": {"same": 0, "diff": 0, "added": 0, "deleted": 0, "total": 0},
-            "details": []
+        self._text_cache.clear()
+        if callback_progress: callback_progress("正在分析源文件 A...")
+        files_a = self.extract_or_walk(path_a)
+        
+        if callback_progress: callback_progress("正在分析目标文件 B...")
+        files_b = self.extract_or_walk(path_b)
+
+        paths = sorted(set(files_a.keys()) | set(files_b.keys()))
+        total_files = len(paths)
+        # 按列存储，每行只占几个机器字，避免上万个 dict 的内存和构造开销
+        category = bytearray(total_files) # 见 CATEGORIES
+        similarity = array("d", bytes(8 * total_files)) # 存储为数字方便排序
+        similarity_flags = bytearray(total_files) # 见 SIM_PREFIX / SIM_BELOW
+        size_a = array("q", bytes(8 * total_files))
+        size_b = array("q", bytes(8 * total_files))
+        pending = [] # 两边都存在、需要读取内容对比的文件
+
+        if callback_progress: callback_progress(f"开始对比 {total_files} 个文件...")
+
+        for i, rel_path in enumerate(paths):
+            entry_a = files_a.get(rel_path)
+            entry_b = files_b.get(rel_path)
+            if entry_a is not None:
+                size_a[i] = entry_a[1]
+            if entry_b is not None:
+                size_b[i] = entry_b[1]
+
+            if entry_a is not None and entry_b is not None:
+                pending.append((i, entry_a[0], entry_b[0], entry_a[2], entry_b[2], entry_a[3], entry_b[3],
+                                entry_a[4], entry_b[4]))
+            elif entry_a is not None:
+                category[i] = DELETED
+            else:
+                category[i] = ADDED
+
+        # 只有大小相同的文件才需要读取内容比对；大小不同必然有差异
+        same_pairs = set()
+        check_pairs = []
+        for i, p_a, p_b, key_a, key_b, crc_a, crc_b, id_a, id_b in pending:
+            # 两边都来自压缩包时，中央目录里的 CRC32 不同即可判定有差异，无需解压
+            if size_a[i] != size_b[i] or crc_a is not None and crc_b is not None and crc_a != crc_b:
+                continue
+            # 两边都是空文件，或指向同一个文件（如对比同一目录或同一个压缩包），无需读取；
+            # 文件标识在遍历时已随 stat 拿到，不必再 samefile
+            if size_a[i] == 0 or p_a == p_b or id_a is not None and id_a == id_b:
+                same_pairs.add((p_a, p_b))
+            else:
+                check_pairs.append((p_a, p_b, key_a, key_b))
+        for pair, is_equal in zip(check_pairs, self.files_equal(check_pairs, callback_progress)):
+            if is_equal:
+                same_pairs.add(pair[:2])
+
+        diff_pending = []
+        for i, p_a, p_b, *_ in pending:
+            if (p_a, p_b) in same_pairs:
+                category[i] = SAME
+                similarity[i] = 1.0
+            else:
+                category[i] = DIFF
+                diff_pending.append((i, p_a, p_b))
+
+        # 文本相似度放进线程池并行计算（文件 IO 会释放 GIL）
+        pairs = [(p_a, p_b, size_a[i], size_b[i]) for i, p_a, p_b in diff_pending]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for done, ((i, _, _), sim) in enumerate(zip(diff_pending, pool.map(self._pair_similarity, pairs)), 1):
+                if callback_progress and done % 20 == 0:
+                    callback_progress(f"对比中... {done}/{len(diff_pending)}")
+                if sim is None:
+                    similarity[i] = NO_SIMILARITY
+                else:
+                    similarity[i], similarity_flags[i] = sim
+
+        summary = {name: category.count(code) for code, name in enumerate(CATEGORIES)}
+        summary["total"] = total_files
+        return {
+            "summary": summary,
+            "details": {"path": paths, "category": category, "similarity": similarity, "similarity_flags": similarity_flags,
+                        "size_a": size_a, "size_b": size_b}
         }
 
-        with tempfile.TemporaryDirectory() as temp_root:
-            if callback_progress: callback_progress("正在分析源文件 A...")
-            files_a = self.extract_or_walk(path_a, temp_root)
-            
-            if callback_progress: callback_progress("正在分析目标文件 B...")
-            files_b = self.extract_or_walk(path_b, temp_root)
-
-            all_keys = set(files_a.keys()) | set(files_b.keys())
-            total_files = len(all_keys)
-            processed = 0
-
-            if callback_progress: callback_progress(f"开始对比 {total_files} 个文件...")
-
-            for rel_path in sorted(list(all_keys)):
-                processed += 1
-                if callback_progress and processed % 20 == 0:
-                    callback_progress(f"对比中... {processed}/{total_files}")
-
-                item = {
-                    "path": rel_path,
-                    "status": "",
-                    "similarity": 0.0, # 存储为数字方便排序
-                    "similarity_str": "0%",
-                    "size_a": 0,
-                    "size_b": 0,
-                    "size_diff": 0,
-                    "type_category": "unknown" # diff, added, deleted, same
-                }
-
-                in_a = rel_path in files_a
-                in_b = rel_path in files_b
-                
-                p_a = files_a.get(rel_path)
-                p_b = files_b.get(rel_path)
-
-                if in_a: item["size_a"] = os.path.getsize(p_a)
-                if in_b: item["size_b"] = os.path.getsize(p_b)
-
-                if in_a and in_b:
-                    item["size_diff"] = item["size_b"] - item["size_a"]
-                    
-                    hash_a = self.get_file_hash(p_a)
-                    hash_b = self.get_file_hash(p_b)
-
-                    if hash_a == hash_b:
-                        item["status"] = "相同"
-                        item["type_category"] = "same"
-                        item["similarity"] = 1.0
-                        item["similarity_str"] = "100%"
-                        result["summary"]["same"] += 1
-                    else:
-                        item["status"] = "差异"
-                        item["type_category"] = "diff"
-                        result["summary"]["diff"] += 1
-                        if self.is_text_file(p_a) and self.is_text_file(p_b):
-                            sim = self.get_text_similarity(p_a, p_b)
-                            item["similarity"] = sim
-                            item["similarity_str"] = f"{sim:.1%}"
-                        else:
-                            item["similarity"] = 0.0
-                            item["similarity_str"] = "Hash不同"
-                
-                elif in_a and not in_b:
-                    item["status"] = "已删除"
-                    item["type_category"] = "deleted"
-                    item["size_diff"] = -item["size_a"]
-                    result["summary"]["deleted"] += 1
-                
-                elif not in_a and in_b:
-                    item["status"] = "新增"
-                    item["type_category"] = "added"
-                    item["size_diff"] = item["size_b"]
-                    result["summary"]["added"] += 1
-
-                result["details"].append(item)
-
-            result["summary"]["total"] = total_files
-            return result
-
 # --- 报告生成逻辑 ---
 
-class ReportGenerator:
-    @staticmethod
-    def generate_html(result_data, output_path):
-        json_data = json.dumps(result_data, ensure_ascii=False)
-        
-        # 将数据预分类，方便 HTML 渲染
-        html_content = f"""
+# HTML 模板拆成头尾两段，中间流式写入 JSON 数据，避免拼出整份报告的大字符串
+REPORT_HTML_HEAD = """
         <!DOCTYPE html>
         <html lang="zh-CN">
         <head>
@@ -181,42 +505,42 @@ class ReportGenerator:
             <title>文件对比深度分析报告</title>
             <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
             <style>
-                body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f0f2f5; margin: 0; padding: 20px; }}
-                .container {{ max-width: 1400px; margin: 0 auto; background: white; padding: 25px; border-radius: 10px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
-                h1 {{ color: #2c3e50; text-align: center; margin-bottom: 30px; }}
+                body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f0f2f5; margin: 0; padding: 20px; }
+                .container { max-width: 1400px; margin: 0 auto; background: white; padding: 25px; border-radius: 10px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }
+                h1 { color: #2c3e50; text-align: center; margin-bottom: 30px; }
                 
                 /* 概览区域 */
-                .dashboard {{ display: flex; flex-wrap: wrap; justify-content: space-around; align-items: center; margin-bottom: 30px; padding-bottom: 20px; border-bottom: 2px solid #eee; }}
-                .chart-box {{ width: 300px; height: 300px; }}
-                .stats-box {{ font-size: 16px; line-height: 1.8; }}
-                .stat-item {{ display: flex; align-items: center; justify-content: space-between; width: 250px; }}
-                .badge {{ padding: 2px 8px; border-radius: 4px; color: white; font-size: 14px; font-weight: bold; }}
+                .dashboard { display: flex; flex-wrap: wrap; justify-content: space-around; align-items: center; margin-bottom: 30px; padding-bottom: 20px; border-bottom: 2px solid #eee; }
+                .chart-box { width: 300px; height: 300px; }
+                .stats-box { font-size: 16px; line-height: 1.8; }
+                .stat-item { display: flex; align-items: center; justify-content: space-between; width: 250px; }
+                .badge { padding: 2px 8px; border-radius: 4px; color: white; font-size: 14px; font-weight: bold; }
                 
                 /* 选项卡样式 */
-                .tab {{ overflow: hidden; border-bottom: 1px solid #ccc; margin-bottom: 15px; }}
-                .tab button {{ background-color: inherit; float: left; border: none; outline: none; cursor: pointer; padding: 14px 20px; transition: 0.3s; font-size: 16px; color: #555; font-weight: 600; }}
-                .tab button:hover {{ background-color: #ddd; }}
-                .tab button.active {{ background-color: #007bff; color: white; }}
+                .tab { overflow: hidden; border-bottom: 1px solid #ccc; margin-bottom: 15px; }
+                .tab button { background-color: inherit; float: left; border: none; outline: none; cursor: pointer; padding: 14px 20px; transition: 0.3s; font-size: 16px; color: #555; font-weight: 600; }
+                .tab button:hover { background-color: #ddd; }
+                .tab button.active { background-color: #007bff; color: white; }
                 
                 /* 表格内容 */
-                .tabcontent {{ display: none; animation: fadeEffect 0.5s; }}
-                @keyframes fadeEffect {{ from {{opacity: 0;}} to {{opacity: 1;}} }}
+                .tabcontent { display: none; animation: fadeEffect 0.5s; }
+                @keyframes fadeEffect { from {opacity: 0;} to {opacity: 1;} }
                 
-                table {{ width: 100%; border-collapse: collapse; font-size: 13px; table-layout: fixed; }}
-                th, td {{ border: 1px solid #e1e4e8; padding: 10px; text-align: left; word-break: break-all; }}
-                th {{ background-color: #f8f9fa; color: #333; position: sticky; top: 0; }}
-                tr:nth-child(even) {{ background-color: #fcfcfc; }}
-                tr:hover {{ background-color: #f1f1f1; }}
+                table { width: 100%; border-collapse: collapse; font-size: 13px; table-layout: fixed; }
+                th, td { border: 1px solid #e1e4e8; padding: 10px; text-align: left; word-break: break-all; }
+                th { background-color: #f8f9fa; color: #333; position: sticky; top: 0; }
+                tr:nth-child(even) { background-color: #fcfcfc; }
+                tr:hover { background-color: #f1f1f1; }
                 
-                .col-path {{ width: 50%; }}
-                .col-status {{ width: 10%; }}
-                .col-sim {{ width: 10%; }}
-                .col-size {{ width: 10%; }}
+                .col-path { width: 50%; }
+                .col-status { width: 10%; }
+                .col-sim { width: 10%; }
+                .col-size { width: 10%; }
                 
-                .c-diff {{ color: #fd7e14; }}
-                .c-add {{ color: #007bff; }}
-                .c-del {{ color: #dc3545; }}
-                .c-same {{ color: #28a745; }}
+                .c-diff { color: #fd7e14; }
+                .c-add { color: #007bff; }
+                .c-del { color: #dc3545; }
+                .c-same { color: #28a745; }
             </style>
         </head>
         <body>
@@ -253,30 +577,29 @@ class ReportGenerator:
             </div>
 
             <script>
-                const data = {json_data};
-                
-                // 填充统计
-                document.getElementById('s-total').innerText = data.summary.total;
-                document.getElementById('s-same').innerText = data.summary.same;
-                document.getElementById('s-diff').innerText = data.summary.diff;
-                document.getElementById('s-added').innerText = data.summary.added;
-                document.getElementById('s-deleted').innerText = data.summary.deleted;
-
-                // 图表
-                new Chart(document.getElementById('diffChart'), {{
-                    type: 'doughnut',
-                    data: {{
-                        labels: ['差异', '新增', '删除', '相同'],
-                        datasets: [{{
-                            data: [data.summary.diff, data.summary.added, data.summary.deleted, data.summary.same],
-                            backgroundColor: ['#fd7e14', '#007bff', '#dc3545', '#28a745']
-                        }}]
-                    }},
-                    options: {{ responsive: true, maintainAspectRatio: false, plugins: {{ legend: {{ position: 'bottom' }} }} }}
-                }});
+                // 数据经 gzip 压缩后以 base64 内嵌，大幅缩小报告体积
+                const payload = \""""
+
+REPORT_HTML_TAIL = """";
+
+                // 优先用浏览器自带的 DecompressionStream 解压；旧浏览器才从 CDN 加载固定版本的 pako
+                function decodePayload(b64) {
+                    const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+                    if (typeof DecompressionStream !== 'undefined') {
+                        const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+                        return new Response(stream).text();
+                    }
+                    return new Promise((resolve, reject) => {
+                        const script = document.createElement('script');
+                        script.src = 'https://cdn.jsdelivr.net/npm/pako@2.1.0/dist/pako.min.js';
+                        script.onload = () => resolve(pako.ungzip(bytes, { to: 'string' }));
+                        script.onerror = reject;
+                        document.head.appendChild(script);
+                    });
+                }
 
                 // 生成表格函数
-                function createTable(items, type) {{
+                function createTable(items, type) {
                     if (items.length === 0) return '<p style="text-align:center; color:#999; padding:20px;">无数据</p>';
                     
                     let html = `
@@ -293,7 +616,7 @@ class ReportGenerator:
                         </thead>
                         <tbody>`;
                     
-                    items.forEach(item => {{
+                    items.forEach(item => {
                         let colorClass = '';
                         if(type === 'diff') colorClass = 'c-diff';
                         else if(type === 'added') colorClass = 'c-add';
@@ -301,60 +624,112 @@ class ReportGenerator:
                         else colorClass = 'c-same';
 
                         // 格式化大小
-                        const sizeA = item.size_a > 0 ? item.size_a.toLocaleString() + ' B' : '-';
-                        const sizeB = item.size_b > 0 ? item.size_b.toLocaleString() + ' B' : '-';
-                        let sizeDiff = item.size_diff > 0 ? '+' + item.size_diff : item.size_diff;
-                        if(item.size_diff === 0) sizeDiff = '-';
+                        // 短键名: p=路径 s=状态 r=相似度 a/b=大小 d=增量
+                        const sizeA = item.a > 0 ? item.a.toLocaleString() + ' B' : '-';
+                        const sizeB = item.b > 0 ? item.b.toLocaleString() + ' B' : '-';
+                        let sizeDiff = item.d > 0 ? '+' + item.d : item.d;
+                        if(item.d === 0) sizeDiff = '-';
 
                         html += `
                             <tr>
-                                <td title="${{item.path}}">${{item.path}}</td>
-                                <td class="${{colorClass}}"><b>${{item.status}}</b></td>
-                                <td>${{item.similarity_str}}</td>
-                                <td>${{sizeA}}</td>
-                                <td>${{sizeB}}</td>
-                                <td style="color:${{item.size_diff > 0 ? 'red' : (item.size_diff < 0 ? 'green' : 'black')}}">
-                                    ${{sizeDiff}}
+                                <td title="${item.p}">${item.p}</td>
+                                <td class="${colorClass}"><b>${item.s}</b></td>
+                                <td>${item.r}</td>
+                                <td>${sizeA}</td>
+                                <td>${sizeB}</td>
+                                <td style="color:${item.d > 0 ? 'red' : (item.d < 0 ? 'green' : 'black')}">
+                                    ${sizeDiff}
                                 </td>
                             </tr>
                         `;
-                    }});
+                    });
                     html += '</tbody></table>';
                     return html;
-                }}
+                }
 
-                // 分类数据
-                const diffItems = data.details.filter(i => i.type_category === 'diff');
-                const addItems = data.details.filter(i => i.type_category === 'added');
-                const delItems = data.details.filter(i => i.type_category === 'deleted');
-                const sameItems = data.details.filter(i => i.type_category === 'same');
+                function render(data) {
+                    // 填充统计
+                    document.getElementById('s-total').innerText = data.summary.total;
+                    document.getElementById('s-same').innerText = data.summary.same;
+                    document.getElementById('s-diff').innerText = data.summary.diff;
+                    document.getElementById('s-added').innerText = data.summary.added;
+                    document.getElementById('s-deleted').innerText = data.summary.deleted;
+
+                    // 图表（Chart.js 来自 CDN，离线时跳过）
+                    if (typeof Chart !== 'undefined') new Chart(document.getElementById('diffChart'), {
+                        type: 'doughnut',
+                        data: {
+                            labels: ['差异', '新增', '删除', '相同'],
+                            datasets: [{
+                                data: [data.summary.diff, data.summary.added, data.summary.deleted, data.summary.same],
+                                backgroundColor: ['#fd7e14', '#007bff', '#dc3545', '#28a745']
+                            }]
+                        },
+                        options: { responsive: true, maintainAspectRatio: false, plugins: { legend: { position: 'bottom' } } }
+                    });
+
+                    // 分类数据（已在生成报告时分好）
+                    const { diff, added, deleted, same } = data.buckets;
+
+                    document.getElementById('TabDiff').innerHTML = createTable(diff, 'diff');
+                    document.getElementById('TabAdd').innerHTML = createTable(added, 'added');
+                    document.getElementById('TabDel').innerHTML = createTable(deleted, 'deleted');
+                    document.getElementById('TabSame').innerHTML = createTable(same, 'same');
+                }
 
-                document.getElementById('TabDiff').innerHTML = createTable(diffItems, 'diff');
-                document.getElementById('TabAdd').innerHTML = createTable(addItems, 'added');
-                document.getElementById('TabDel').innerHTML = createTable(delItems, 'deleted');
-                document.getElementById('TabSame').innerHTML = createTable(sameItems, 'same');
+                decodePayload(payload).then(text => render(JSON.parse(text)));
 
                 // Tab 切换逻辑
-                window.openTab = function(evt, tabName) {{
+                window.openTab = function(evt, tabName) {
                     var i, tabcontent, tablinks;
                     tabcontent = document.getElementsByClassName("tabcontent");
-                    for (i = 0; i < tabcontent.length; i++) {{
+                    for (i = 0; i < tabcontent.length; i++) {
                         tabcontent[i].style.display = "none";
-                    }}
+                    }
                     tablinks = document.getElementsByClassName("tablinks");
-                    for (i = 0; i < tablinks.length; i++) {{
+                    for (i = 0; i < tablinks.length; i++) {
                         tablinks[i].className = tablinks[i].className.replace(" active", "");
-                    }}
+                    }
                     document.getElementById(tabName).style.display = "block";
                     evt.currentTarget.className += " active";
-                }}
+                }
             </script>
         </body>
         </html>
         """
+
+class ReportGenerator:
+    @staticmethod
+    def _write_json_rows(f, rows, batch_size=1000):
+        """分批写入 JSON 数组：每批仍走 json.dumps 的 C 编码器（json.dump 会退回纯 Python 实现）"""
+        f.write("[")
+        for start in range(0, len(rows), batch_size):
+            if start: f.write(",")
+            f.write(json.dumps(rows[start:start + batch_size], ensure_ascii=False, separators=(",", ":"))[1:-1])
+        f.write("]")
+
+    @staticmethod
+    def generate_html(result_data, output_path):
+        # 将数据预分类，方便 HTML 渲染；行内使用短键名以缩小内嵌 JSON
+        buckets = {"diff": [], "added": [], "deleted": [], "same": []}
+        for path, cat, status, _, sim_str, size_a, size_b, size_diff in iter_details(result_data["details"]):
+            buckets[cat].append({"p": path, "s": status, "r": sim_str, "a": size_a, "b": size_b, "d": size_diff})
         try:
+            # JSON 边编码边 gzip 压缩到内存，文本 JSON 通常能压到原来的几分之一
+            payload = io.BytesIO()
+            with io.TextIOWrapper(gzip.GzipFile(fileobj=payload, mode="wb", compresslevel=6, mtime=0), encoding="utf-8") as f:
+                f.write('{"summary":')
+                f.write(json.dumps(result_data["summary"], separators=(",", ":")))
+                f.write(',"buckets":{')
+                for i, (name, rows) in enumerate(buckets.items()):
+                    if i: f.write(",")
+                    f.write(f'"{name}":')
+                    ReportGenerator._write_json_rows(f, rows)
+                f.write("}}")
             with open(output_path, "w", encoding="utf-8") as f:
-                f.write(html_content)
+                f.write(REPORT_HTML_HEAD)
+                f.write(base64.b64encode(payload.getvalue()).decode("ascii"))
+                f.write(REPORT_HTML_TAIL)
             return True
         except Exception as e:
             print(f"Export failed: {e}")
@@ -369,6 +744,7 @@ class DiffApp:
         self.root.geometry("1100x700")
         self.analyzer = FileAnalyzer()
         self.compare_result = None
+        self._row_keys = {} # {表格行 id: 各列原始值}，排序时直接使用，无需解析显示文本
 
         self._init_ui()
 
@@ -404,6 +780,7 @@ class DiffApp:
         tree_frame.pack(fill="both", expand=True, padx=10, pady=5)
 
         cols = ("path", "status", "sim", "size_a", "size_b", "diff_val")
+        self._col_index = {c: i for i, c in enumerate(cols)}
         self.tree = ttk.Treeview(tree_frame, columns=cols, show="headings")
         
         # 定义列属性
@@ -455,6 +832,7 @@ class DiffApp:
         
         self.btn_compare.config(state="disabled")
         self.tree.delete(*self.tree.get_children())
+        self._row_keys.clear()
         self.progress.pack(fill="x", padx=10)
         self.progress.start(10)
         
@@ -482,35 +860,36 @@ class DiffApp:
         
         # 1. 先清空表格
         self.tree.delete(*self.tree.get_children())
+        self._row_keys.clear()
         
         # 2. 准备数据
-        all_items = result["details"]
-        total_items = len(all_items)
-        batch_size = 50  # 每次加载 50 行
+        details = result["details"]
+        total_items = len(details["path"])
+        batch_size = 1000  # 表格隐藏期间插入不触发重绘，每批可以多插一些
+
+        # 插入期间把表格从界面摘下并隐藏所有列，Tk 不必在每批之后重新布局和重绘
+        self.tree.pack_forget()
+        self.tree.configure(displaycolumns=())
         
         # 3. 定义递归插入函数
         def insert_batch(start_index):
             end_index = min(start_index + batch_size, total_items)
             
-            # 临时关闭屏幕更新以提高插入速度（可选，但对Treeview很有效）
-            # self.tree.pack_forget() 
-            
-            for i in range(start_index, end_index):
-                item = all_items[i]
-                sa = f"{item['size_a']:,}" if item['size_a'] > 0 else "-"
-                sb = f"{item['size_b']:,}" if item['size_b'] > 0 else "-"
-                sd = f"{item['size_diff']:+,}" if item['size_diff'] != 0 else "-"
+            for path, cat, status, sim, sim_str, size_a, size_b, size_diff in iter_details(details, start_index, end_index):
+                sa = f"{size_a:,}" if size_a > 0 else "-"
+                sb = f"{size_b:,}" if size_b > 0 else "-"
+                sd = f"{size_diff:+,}" if size_diff != 0 else "-"
                 
-                self.tree.insert("", "end", values=(
-                    item["path"], 
-                    item["status"], 
-                    item["similarity_str"], 
+                iid = self.tree.insert("", "end", values=(
+                    path, 
+                    status, 
+                    sim_str, 
                     sa, 
                     sb, 
                     sd
-                ), tags=(item["type_category"],))
-            
-            # self.tree.pack(side="left", fill="both", expand=True) # 如果上面隐藏了，这里要显示回来
+                ), tags=(cat,))
+                # 顺序与 cols 一致
+                self._row_keys[iid] = (path.lower(), status, sim, size_a, size_b, size_diff)
 
             # 更新一下界面上的提示，让用户知道正在渲染
             self.lbl_info.config(text=f"正在渲染列表... {end_index}/{total_items}")
@@ -519,12 +898,14 @@ class DiffApp:
                 # 如果还没插完，10毫秒后继续插下一批
                 self.root.after(10, insert_batch, end_index)
             else:
-                # 全部插完，恢复最终状态提示
+                # 全部插完，一次性恢复列并重新显示表格
+                self.tree.configure(displaycolumns="#all")
+                self.tree.pack(side="left", fill="both", expand=True)
+                # 恢复最终状态提示
                 self.lbl_info.config(text=f"就绪! 总计: {summary['total']} | 差异: {summary['diff']} | 新增: {summary['added']} | 删除: {summary['deleted']}")
         
-        # 4. 启动第一批插入
-        if total_items > 0:
-            insert_batch(0)
+        # 4. 启动第一批插入（没有数据时也要走一遍，以便把表格显示回来）
+        insert_batch(0)
         # --- 优化结束 ---
 
     def _reset_ui(self):
@@ -542,25 +923,18 @@ class DiffApp:
 
     # --- 增强的排序算法 ---
     def sort_tree(self, col, reverse):
-        l = [(self.tree.set(k, col), k) for k in self.tree.get_children('')]
-        
-        def convert(val):
-            # 处理字符串转数字用于排序
-            s = val.replace(',', '').replace('%', '').replace('+', '')
-            if s == '-': return -1 if 'size' in col or 'diff' in col else 0
-            try:
-                return float(s)
-            except ValueError:
-                return s.lower()
-
-        l.sort(key=lambda t: convert(t[0]), reverse=reverse)
+        # 直接按插入时记录的原始数值排序，不再逐行读取并解析 "1,234" / "12%" 这样的显示文本
+        index = self._col_index[col]
+        keys = self._row_keys
+        iids = sorted(keys, key=lambda k: keys[k][index], reverse=reverse)
 
-        for index, (_, k) in enumerate(l):
-            self.tree.move(k, '', index)
+        # 一次调用重排全部行，代替逐行 move
+        self.tree.set_children('', *iids)
 
         self.tree.heading(col, command=lambda: self.sort_tree(col, not reverse))
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # 打包后的程序启动哈希子进程时需要
     root = tk.Tk()
     DiffApp(root)
     root.mainloop()
\ No newline at end of file